@@ -5,148 +5,274 @@ Saves results back to the CSV as a new 'name' column.
 Run this before send_campaign.py.
 """
 
+import argparse
+import asyncio
 import csv
+import io
+import json
 import os
+import random
 import re
-import time
-import unicodedata
-from playwright.sync_api import sync_playwright
+from pathlib import Path
+from playwright.async_api import Error, TimeoutError as PlaywrightTimeoutError, async_playwright
 
-
-def clean_name(raw_name, fallback=""):
-    """Extract just the first name from a messy IG display name."""
-    if not raw_name or not raw_name.strip():
-        return fallback
-
-    name = raw_name.strip()
-
-    emoji_re = re.compile(
-        "[\U0001F1E0-\U0001F1FF"
-        "\U0001F300-\U0001F9FF"
-        "\u2600-\u27BF"
-        "\u25A0-\u25FF"
-        "\uFE0F\u200D]",
-        flags=re.UNICODE
-    )
-    name = emoji_re.sub("", name).strip()
-    name = re.split(r"\s*[|•·▫◽/]\s*|\s+[-—]\s+", name)[0].strip()
-    name = name.rstrip(".,!?♡✨✺ ")
-
-    words = [w for w in name.split() if w]
-    if not words:
-        return fallback
-
-    first_name = unicodedata.normalize("NFKC", words[0])
-    return first_name.capitalize()
+from name_utils import clean_name
 
 CSV_FILE = "influencers.csv"
 SESSION_FILE = "ig_session.json"
+CACHE_FILE = "ig_names_cache.jsonl"  # fetched names not yet merged into the CSV; removed after the merge
+DEFAULT_CDP_ENDPOINT = "http://localhost:9222"
+CONCURRENCY = 6  # profile pages open at once in the shared context
+RATE_LIMIT_BACKOFF = 5  # multiplier on the retry delay after an HTTP 429
+
+OG_TITLE_SELECTOR = 'meta[property="og:title"]'
+# Matched against the full URL, so allow the query strings Instagram's CDN appends
+BLOCKED_RESOURCES = re.compile(r"\.(?:png|jpe?g|webp|mp4|woff2?|css)(?:\?|$)")
+# "Jane Doe (@janedoe) • Instagram photos and videos" -> "Jane Doe"
+_DISPLAY_NAME_RE = re.compile(r"^(.+?)\s*\(@")
 
 
 def load_influencers():
+    """Return (rows, fieldnames), making sure there is a 'name' column to fill in."""
     with open(CSV_FILE, newline="", encoding="utf-8") as f:
-        return list(csv.DictReader(f))
-
-
-def save_influencers(rows):
-    fieldnames = ["ig_handle", "email", "name"]
-    with open(CSV_FILE, "w", newline="", encoding="utf-8") as f:
-        writer = csv.DictWriter(f, fieldnames=fieldnames)
-        writer.writeheader()
-        writer.writerows(rows)
+        reader = csv.DictReader(f)
+        rows = list(reader)
+        fieldnames = list(reader.fieldnames or [])
+    if "name" not in fieldnames:
+        fieldnames.append("name")
+    return rows, fieldnames
+
+
+def save_influencers(rows, fieldnames):
+    # Format the whole file in memory and hand it to the OS in a single write
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    writer.writerow(fieldnames)
+    writer.writerows([[r.get(k) or "" for k in fieldnames] for r in rows])
+    Path(CSV_FILE).write_text(buf.getvalue(), encoding="utf-8", newline="")
+
+
+def load_name_cache():
+    """Return {ig_handle: name} for handles fetched by earlier (possibly interrupted) runs."""
+    cache = {}
+    if not os.path.exists(CACHE_FILE):
+        return cache
+    with open(CACHE_FILE, encoding="utf-8") as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                continue  # partial last line from a crash
+            cache[entry["ig_handle"]] = entry["name"]
+    return cache
+
+
+async def _is_logged_in(context):
+    page = await context.new_page()
+    await page.goto("https://www.instagram.com/", wait_until="domcontentloaded", timeout=30000)
+    logged_in = "/accounts/login/" not in page.url
+    await page.close()
+    return logged_in
+
+
+async def _log_in(context):
+    page = await context.new_page()
+    await page.goto("https://www.instagram.com/accounts/login/")
+    print("\nA browser window has opened. Please log in to Instagram.")
+    print("The script will continue automatically once you are logged in...\n")
+    await page.wait_for_url(
+        re.compile(r"instagram\.com(?!/accounts/login)"),
+        timeout=180000
+    )
+    await context.storage_state(path=SESSION_FILE)
+    print(f"Login successful! Session saved to {SESSION_FILE}\n")
+    await page.close()
 
 
-def ensure_ig_session(playwright):
-    browser = playwright.chromium.launch(headless=False)
+async def ensure_ig_session(playwright, cdp_endpoint=DEFAULT_CDP_ENDPOINT):
+    """
+    Return (browser, context, reused). Connects to a long-lived browser over CDP
+    when one is listening, otherwise launches a fresh one. reused is True when the
+    context belongs to that long-lived browser and must be left open on exit.
+    """
+    try:
+        browser = await playwright.chromium.connect_over_cdp(cdp_endpoint, timeout=5000)
+        print(f"Connected to running browser at {cdp_endpoint}.")
+    except Error:
+        print(f"No browser listening at {cdp_endpoint} — launching a new one.")
+        browser = await playwright.chromium.launch(headless=False)
+
+    if browser.contexts:
+        # The running browser's profile holds the login cookies, so use it as-is
+        context = browser.contexts[0]
+        if await _is_logged_in(context):
+            print("Instagram session reused from running browser.\n")
+        else:
+            await _log_in(context)
+        return browser, context, True
 
     if os.path.exists(SESSION_FILE):
-        context = browser.new_context(storage_state=SESSION_FILE)
-        page = context.new_page()
-        page.goto("https://www.instagram.com/", wait_until="domcontentloaded", timeout=30000)
-        if "/accounts/login/" not in page.url:
+        context = await browser.new_context(storage_state=SESSION_FILE)
+        if await _is_logged_in(context):
             print("Instagram session loaded from saved file.\n")
-            page.close()
-            return browser, context
+            return browser, context, False
         print("Saved session expired — need to log in again.")
-        page.close()
-        context.close()
+        await context.close()
+
+    context = await browser.new_context()
+    await _log_in(context)
+    return browser, context, False
+
+
+async def _abort(route):
+    await route.abort()
 
-    context = browser.new_context()
-    page = context.new_page()
-    page.goto("https://www.instagram.com/accounts/login/")
-    print("\nA browser window has opened. Please log in to Instagram.")
-    print("The script will continue automatically once you are logged in...\n")
-    page.wait_for_url(
-        re.compile(r"instagram\.com(?!/accounts/login)"),
-        timeout=180000
-    )
-    context.storage_state(path=SESSION_FILE)
-    print(f"Login successful! Session saved to {SESSION_FILE}\n")
-    page.close()
-    return browser, context
 
+class RateLimitedError(Exception):
+    """Instagram answered a profile request with HTTP 429."""
 
-def get_ig_name(context, ig_handle):
-    page = context.new_page()
+
+async def _fetch_display_name(context, ig_handle):
+    """Single attempt; returns "" when the page has no display name and raises on failures."""
+    page = await context.new_page()
     try:
-        page.goto(
+        # Only the <meta> tags in the initial HTML are needed; skip media, fonts and styles
+        await page.route(BLOCKED_RESOURCES, _abort)
+        response = await page.goto(
             f"https://www.instagram.com/{ig_handle}/",
-            wait_until="domcontentloaded",
-            timeout=20000
+            wait_until="commit",
+            timeout=10000
         )
-        og_title = page.get_attribute('meta[property="og:title"]', "content")
+        if response is not None and response.status == 429:
+            raise RateLimitedError("HTTP 429 Too Many Requests")
+        try:
+            meta = await page.wait_for_selector(OG_TITLE_SELECTOR, state="attached", timeout=5000)
+            og_title = await meta.get_attribute("content")
+        except PlaywrightTimeoutError:
+            og_title = None
         if og_title:
-            match = re.match(r"^(.+?)\s*\(@", og_title)
+            match = _DISPLAY_NAME_RE.match(og_title)
             if match:
                 return match.group(1).strip()
-        title = page.title()
-        match = re.match(r"^(.+?)\s*\(@", title)
+        title = await page.title()
+        match = _DISPLAY_NAME_RE.match(title)
         if match:
             return match.group(1).strip()
-    except Exception as e:
-        print(f"  WARNING: Could not fetch name for @{ig_handle}: {e}")
     finally:
-        page.close()
+        await page.close()
     return ""
 
 
-def main():
-    rows = load_influencers()
+async def get_ig_name(context, ig_handle, *, max_retries=3):
+    """Fetch the display name, retrying transient failures with exponential backoff."""
+    delay = 1.0
+    for attempt in range(max_retries):
+        try:
+            return await _fetch_display_name(context, ig_handle)
+        except (Error, RateLimitedError) as e:
+            if attempt == max_retries - 1:
+                raise
+            # Back off harder when Instagram says outright that we are going too fast
+            wait = delay * (RATE_LIMIT_BACKOFF if isinstance(e, RateLimitedError) else 1) + random.random()
+            print(f"  @{ig_handle}: attempt {attempt + 1} failed ({e}), retrying in {wait:.1f}s...")
+            await asyncio.sleep(wait)
+            delay *= 2
+
+
+async def cache_writer(cache_f, queue):
+    """Single writer: apply fetched names and append them to the cache, so workers never touch files."""
+    while True:
+        item = await queue.get()
+        if item is None:
+            break
+        row, handle, name = item
+        row["name"] = name
+        # No flush per line; the OS buffers appends and the file is closed at exit
+        cache_f.write(json.dumps({"ig_handle": handle, "name": name}) + "\n")
+
+
+async def amain(cdp_endpoint=DEFAULT_CDP_ENDPOINT):
+    rows, fieldnames = load_influencers()
     print(f"Found {len(rows)} influencer(s) in CSV.\n")
 
-    with sync_playwright() as p:
-        browser, context = ensure_ig_session(p)
-
-        for i, row in enumerate(rows):
-            handle = row["ig_handle"].strip().lstrip("@")
-            existing_name = row.get("name", "").strip()
-
-            if existing_name:
-                print(f"[{i+1}/{len(rows)}] @{handle} — already has name: {existing_name}, skipping.")
-                continue
-
-            print(f"[{i+1}/{len(rows)}] Fetching name for @{handle}...")
-            name = get_ig_name(context, handle)
-
-            if name:
-                print(f"  Found: {name}")
-            else:
-                print(f"  Not found. Will use handle as fallback when sending.")
-
-            row["name"] = clean_name(name, fallback=handle)
-
-            # Save after each fetch so progress isn't lost if script is interrupted
-            save_influencers(rows)
-
-            if i < len(rows) - 1:
-                time.sleep(2)
-
-        context.close()
-        browser.close()
+    cached = load_name_cache()
+    restored = 0
+    for row in rows:
+        handle = row["ig_handle"].strip().lstrip("@")
+        if not row.get("name", "").strip() and handle in cached:
+            row["name"] = cached[handle]
+            restored += 1
+    if restored:
+        print(f"Restored {restored} name(s) from {CACHE_FILE}.\n")
+
+    cache_f = open(CACHE_FILE, "a", encoding="utf-8", buffering=8192)
+    try:
+        async with async_playwright() as p:
+            browser, context, reused = await ensure_ig_session(p, cdp_endpoint)
+
+            sem = asyncio.Semaphore(CONCURRENCY)
+            queue = asyncio.Queue()
+            writer = asyncio.create_task(cache_writer(cache_f, queue))
+
+            async def bounded(i, row):
+                handle = row["ig_handle"].strip().lstrip("@")
+                existing_name = row.get("name", "").strip()
+
+                if existing_name:
+                    print(f"[{i+1}/{len(rows)}] @{handle} — already has name: {existing_name}, skipping.")
+                    return
+
+                async with sem:
+                    print(f"[{i+1}/{len(rows)}] Fetching name for @{handle}...")
+                    try:
+                        name = await get_ig_name(context, handle)
+                    except (Error, RateLimitedError) as e:
+                        # Leave the row unnamed so the next run tries this handle again
+                        print(f"  WARNING: Could not fetch name for @{handle}: {e}")
+                    else:
+                        if name:
+                            print(f"  @{handle} found: {name}")
+                        else:
+                            print(f"  @{handle} not found. Will use handle as fallback when sending.")
+
+                        await queue.put((row, handle, clean_name(name, fallback=handle)))
+
+                    # Hold the slot briefly so requests stay spread out; delays overlap across workers
+                    await asyncio.sleep(random.uniform(1, 2))
+
+            try:
+                tasks = [asyncio.create_task(bounded(i, row)) for i, row in enumerate(rows)]
+                await asyncio.gather(*tasks)
+            finally:
+                await queue.put(None)
+                await writer
+
+            if not reused:
+                await context.close()
+            # For a CDP connection this only disconnects; the browser keeps running
+            await browser.close()
+    finally:
+        cache_f.close()
+        # Rewrite the CSV once from the merged state, even if interrupted
+        save_influencers(rows, fieldnames)
+        # Everything cached is in the CSV now; keep the cache for unmerged names only,
+        # so clearing a name in the CSV still gets it refetched
+        os.remove(CACHE_FILE)
 
     print("\nAll done! Names saved to influencers.csv.")
     print("Review the CSV, then run send_campaign.py to send emails.")
 
 
+def main(cdp_endpoint=DEFAULT_CDP_ENDPOINT):
+    asyncio.run(amain(cdp_endpoint))
+
+
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Fetch Instagram display names into influencers.csv.")
+    parser.add_argument(
+        "--cdp-endpoint",
+        default=DEFAULT_CDP_ENDPOINT,
+        help=f"DevTools endpoint of an already-running Chromium (default: {DEFAULT_CDP_ENDPOINT})",
+    )
+    args = parser.parse_args()
+    main(cdp_endpoint=args.cdp_endpoint)
@@ -0,0 +1,52 @@
+"""
+Shared helpers for turning messy Instagram display names into first names.
+Used by both fetch_names.py and send_email.py.
+"""
+
+import functools
+import re
+import unicodedata
+
+# Emojis and flag characters, stripped with str.translate (a C-level table lookup)
+_EMOJI_RANGES = [
+    (0x1F1E0, 0x1F1FF),  # country flags
+    (0x1F300, 0x1F9FF),  # misc symbols, emoticons
+    (0x2600, 0x27BF),    # misc symbols & dingbats
+    (0x25A0, 0x25FF),    # geometric shapes (▫◽)
+]
+_EMOJI_CPS = set()
+for _lo, _hi in _EMOJI_RANGES:
+    _EMOJI_CPS.update(range(_lo, _hi + 1))
+_EMOJI_CPS.update([0xFE0F, 0x200D])  # variation selector, zero-width joiner
+_EMOJI_TBL = dict.fromkeys(_EMOJI_CPS, None)
+
+# Title separators, e.g. "Jane | UGC Creator" or "Jane - Travel". Spaces, tabs and
+# NBSP cover display names, so skip the much larger Unicode-aware \s class.
+_SEP_RE = re.compile(r"[ \t\u00A0]*[|•·▫◽/][ \t\u00A0]*|[ \t\u00A0]+[-—][ \t\u00A0]+")
+
+# Leftover trailing symbols
+_TRAIL_CHARS = ".,!?♡✨✺ "
+
+
+@functools.lru_cache(maxsize=2048)
+def clean_name(raw_name, fallback=""):
+    """Extract just the first name from a messy IG display name."""
+    if not raw_name or not raw_name.strip():
+        return fallback
+
+    name = raw_name.strip()
+    name = name.translate(_EMOJI_TBL).strip()
+
+    # Split on title separators and take the first part
+    name = _SEP_RE.split(name)[0].strip()
+    name = name.rstrip(_TRAIL_CHARS)
+
+    # Take just the first word (first name)
+    words = [w for w in name.split() if w]
+    if not words:
+        return fallback
+
+    # NFKC is a no-op on ASCII, which most names are once emojis are gone
+    w0 = words[0]
+    first_name = w0 if w0.isascii() else unicodedata.normalize("NFKC", w0)
+    return first_name.capitalize()
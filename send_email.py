@@ -5,18 +5,27 @@ Run fetch_names.py first to populate the 'name' column.
 """
 
 import csv
+import functools
+import html
 import smtplib
 import imaplib
 import ssl
+import threading
 import time
 import os
 import sys
 import re
-import unicodedata
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
 from datetime import date
+from email.charset import Charset
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from dotenv import load_dotenv
+from jinja2 import Environment, FileSystemLoader
+from markupsafe import Markup
+
+from name_utils import clean_name
 
 load_dotenv()
 
@@ -25,41 +34,69 @@ SMTP_PORT = int(os.getenv("SMTP_PORT", "587"))
 SENDER_EMAIL = os.getenv("SENDER_EMAIL")
 SENDER_PASSWORD = os.getenv("SENDER_PASSWORD")
 
+SEND_INTERVAL_SEC = float(os.getenv("SEND_INTERVAL_SEC", "30"))
+IMAP_HOST = "imap.secureserver.net"
+IMAP_PORT = 993
+IMAP_CONNECTIONS = int(os.getenv("IMAP_CONNECTIONS", "4"))
+
 CSV_FILE = "influencers.csv"
 EMAIL_BODY_FILE = "email_body.txt"
+EMAIL_TEMPLATE_FILE = "email_template.html.j2"
 
+_BOLD_RE = re.compile(r"\*\*(.+?)\*\*")
+_SOLO_HEADING_RE = re.compile(r"^\*\*[^*]+\*\*$")
 
-def clean_name(raw_name, fallback=""):
-    """Extract just the first name from a messy IG display name."""
-    if not raw_name or not raw_name.strip():
-        return fallback
+Influencer = namedtuple("Influencer", ["ig_handle", "email", "name", "sent_date", "row"])
 
-    name = raw_name.strip()
+# Compiled once; each render is a straight pass over the precompiled template
+_jinja_env = Environment(
+    loader=FileSystemLoader(os.path.dirname(os.path.abspath(__file__))),
+    autoescape=True,
+    trim_blocks=True,
+    lstrip_blocks=True,
+)
+_HTML_TEMPLATE = _jinja_env.get_template(EMAIL_TEMPLATE_FILE)
 
-    # Remove emojis and flag characters
-    emoji_re = re.compile(
-        "[\U0001F1E0-\U0001F1FF"   # country flags
-        "\U0001F300-\U0001F9FF"    # misc symbols, emoticons
-        "\u2600-\u27BF"            # misc symbols & dingbats
-        "\u25A0-\u25FF"            # geometric shapes (▫◽)
-        "\uFE0F\u200D]",           # variation selectors, zero-width joiner
-        flags=re.UNICODE
-    )
-    name = emoji_re.sub("", name).strip()
+SUBJECT_TEMPLATE = "Collab Invite: Viralt x @__HANDLE__"
+
+# Leave bodies as raw UTF-8 (no base64/QP) so placeholders stay byte-replaceable
+_UTF8_8BIT = Charset("utf-8")
+_UTF8_8BIT.body_encoding = None
 
-    # Split on title separators and take the first part
-    name = re.split(r"\s*[|•·▫◽/]\s*|\s+[-]\s+", name)[0].strip()
+# RFC 5321/5322 cap a line at 998 octets, which matters once bodies go out as 8bit.
+# Lines holding a placeholder keep headroom for the name or address filled in later.
+MAX_LINE_OCTETS = 998
+PLACEHOLDER_HEADROOM = 100
+_PLACEHOLDERS = (b"__TO__", b"__HANDLE__", b"{name}", b"{html_name}")
 
-    # Remove leftover trailing symbols
-    name = name.rstrip(".,!?♡✨✺ ")
+# One LIST response line: (flags) "delimiter" mailbox
+_LIST_RE = re.compile(rb'^\((?P<flags>[^)]*)\) (?:"[^"]*"|NIL) (?P<name>.+)$')
+_DRAFTS_FOLDER = None  # cached after the first successful APPEND
 
-    # Take just the first word (first name)
-    words = [w for w in name.split() if w]
-    if not words:
-        return fallback
+SMTP_RETRY_CODES = {421, 450, 452}  # transient: service unavailable, mailbox busy, over quota
+SMTP_MAX_RETRIES = 4
+SMTP_NOOP_EVERY = 10  # check the connection is still alive every N sends
 
-    first_name = unicodedata.normalize("NFKC", words[0])
-    return first_name.capitalize()
+
+class RateLimiter:
+    """Token bucket allowing tokens_per_minute acquisitions per minute, up to `burst` back-to-back."""
+
+    def __init__(self, tokens_per_minute, burst=1):
+        self.rate = tokens_per_minute / 60.0
+        self.capacity = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+
+    def acquire(self):
+        """Block until a token is available, then take it."""
+        while True:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return
+            time.sleep((1 - self.tokens) / self.rate)
 
 
 def load_email_body():
@@ -68,51 +105,57 @@ def load_email_body():
 
 
 def load_influencers():
+    """
+    Return (influencers, rows, header). rows are the raw CSV rows as lists, padded
+    to the header (which always ends up with a sent_date column); each Influencer
+    keeps a reference to its row so sent dates can be written back in place.
+    """
     influencers = []
-    with open(CSV_FILE, newline="", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            handle = row["ig_handle"].strip().lstrip("@")
-            email = row["email"].strip()
-            name = clean_name(row.get("name", ""), fallback="there")
-            sent_date = row.get("sent_date", "").strip()
-            if handle and email:
-                influencers.append({"ig_handle": handle, "email": email, "name": name, "sent_date": sent_date})
-    return influencers
-
-
-def mark_sent(ig_handle, date_str):
-    """Write the sent date back to the CSV for a given handle."""
-    rows = []
-    with open(CSV_FILE, newline="", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        fieldnames = reader.fieldnames
-        for row in reader:
-            if row["ig_handle"].strip().lstrip("@") == ig_handle and not row.get("sent_date", "").strip():
-                row["sent_date"] = date_str
-            rows.append(row)
-    with open(CSV_FILE, "w", newline="", encoding="utf-8") as f:
-        writer = csv.DictWriter(f, fieldnames=fieldnames)
-        writer.writeheader()
+    with open(CSV_FILE, newline="", encoding="utf-8", buffering=65536) as f:
+        reader = csv.reader(f)
+        header = next(reader, [])
+        rows = list(reader)
+    # Empty file or no usable columns: let main() report "No influencers found"
+    if not rows or "ig_handle" not in header or "email" not in header:
+        return influencers, rows, header
+    if "sent_date" not in header:
+        header.append("sent_date")
+    idx = {col: i for i, col in enumerate(header)}
+    handle_i, email_i, sent_i = idx["ig_handle"], idx["email"], idx["sent_date"]
+    name_i = idx.get("name")
+    width = len(header)
+    for row in rows:
+        if len(row) < width:
+            row.extend([""] * (width - len(row)))
+        handle = row[handle_i].strip().lstrip("@")
+        email = row[email_i].strip()
+        if handle and email:
+            name = clean_name(row[name_i] if name_i is not None else "", fallback="there")
+            influencers.append(Influencer(handle, email, name, row[sent_i].strip(), row))
+    return influencers, rows, header
+
+
+def _flush_csv(rows, header):
+    """Write all rows back to the CSV atomically via a temp file."""
+    tmp_file = CSV_FILE + ".tmp"
+    with open(tmp_file, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(header)
         writer.writerows(rows)
+    os.replace(tmp_file, CSV_FILE)
 
 
-def to_html(text):
-    import html as html_module
-
-    PARA_STYLE  = 'style="margin:0 0 14px 0;font-size:15px;line-height:1.6;color:#222;"'
-    LI_STYLE    = 'style="margin-bottom:7px;font-size:15px;line-height:1.6;color:#222;"'
-    UL_STYLE    = 'style="margin:0 0 28px 20px;padding-left:0;"'
-    HDG_STYLE   = ('style="margin:20px 0 8px 0;font-size:15px;font-weight:700;'
-                   'color:#111;"')
-
+def parse_blocks(text):
+    """
+    Parse the plain-text body into blocks for the HTML template, in one pass:
+    ("para", [lines]), ("ul", [items]) or ("h", heading_text). Inline **bold**
+    is rendered here, so paragraph lines and bullet items are already Markup.
+    """
     def fmt(line):
-        escaped = html_module.escape(line)
-        return re.sub(r"\*\*(.+?)\*\*", r"<strong>\1</strong>", escaped)
+        return Markup(_BOLD_RE.sub(r"<strong>\1</strong>", html.escape(line)))
 
-    def is_solo_heading(stripped):
-        """True when the entire line is wrapped in **...**"""
-        return bool(re.match(r"^\*\*[^*]+\*\*$", stripped))
+    # True when the entire line is wrapped in **...**
+    is_solo_heading = _SOLO_HEADING_RE.match
 
     blocks = []
     current_para = []
@@ -120,13 +163,12 @@ def to_html(text):
 
     def flush_para():
         if current_para:
-            blocks.append(f'<p {PARA_STYLE}>' + "<br>".join(current_para) + "</p>")
+            blocks.append(("para", list(current_para)))
             current_para.clear()
 
     def flush_bullets():
         if current_bullets:
-            items = "".join(f"<li {LI_STYLE}>{item}</li>" for item in current_bullets)
-            blocks.append(f"<ul {UL_STYLE}>{items}</ul>")
+            blocks.append(("ul", list(current_bullets)))
             current_bullets.clear()
 
     for line in text.split("\n"):
@@ -137,8 +179,7 @@ def to_html(text):
         elif stripped and is_solo_heading(stripped):
             flush_para()
             flush_bullets()
-            heading_text = html_module.escape(stripped[2:-2])
-            blocks.append(f"<p {HDG_STYLE}>{heading_text}</p>")
+            blocks.append(("h", stripped[2:-2]))  # escaped by the template
         elif stripped:
             flush_bullets()
             current_para.append(fmt(line))
@@ -148,82 +189,205 @@ def to_html(text):
 
     flush_para()
     flush_bullets()
+    return blocks
+
+
+# main() renders once per campaign; the cache is a fallback in case rendering ever becomes per-recipient again
+@functools.lru_cache(maxsize=256)
+def to_html(text):
+    return _HTML_TEMPLATE.render(blocks=parse_blocks(text))
+
 
-    body_html = "\n".join(blocks)
-
-    signature = """\
-<br>
-<table cellpadding="0" cellspacing="0" border="0">
-  <tr>
-    <td>
-      <img src="https://viralt.ai/assets/viralt-horizontal-logo-Disq2McJ.png"
-           alt="Viralt" width="150" style="display:block;margin-bottom:8px;border:0;">
-      <p style="margin:0;font-size:13px;color:#555;">
-        <a href="https://viralt.ai/home"
-           style="color:#555;text-decoration:none;">Website</a>&nbsp;&nbsp;&nbsp;&nbsp;<a href="https://www.instagram.com/viralt.ai/"
-           style="color:#555;text-decoration:none;">Instagram</a>&nbsp;&nbsp;&nbsp;&nbsp;<a href="https://www.linkedin.com/company/viraltai/"
-           style="color:#555;text-decoration:none;">LinkedIn</a>&nbsp;&nbsp;&nbsp;&nbsp;<a href="https://x.com/Viralt_AI"
-           style="color:#555;text-decoration:none;">X</a>
-      </p>
-    </td>
-  </tr>
-</table>"""
-
-    return f"""\
-<!DOCTYPE html>
-<html lang="en">
-<head>
-  <meta charset="UTF-8">
-  <meta name="viewport" content="width=device-width,initial-scale=1">
-</head>
-<body style="margin:0;padding:0;background:#ffffff;">
-  <table width="100%" cellpadding="0" cellspacing="0" border="0"
-         style="background:#ffffff;">
-    <tr>
-      <td align="center">
-        <table width="600" cellpadding="0" cellspacing="0" border="0"
-               style="max-width:600px;width:100%;padding:30px 24px;
-                      font-family:Arial,sans-serif;font-size:15px;
-                      line-height:1.6;color:#222;">
-          <tr>
-            <td>
-{body_html}
-<br>
-{signature}
-            </td>
-          </tr>
-        </table>
-      </td>
-    </tr>
-  </table>
-</body>
-</html>"""
-
-
-def build_message(sender, recipient_email, subject, plain_body):
+def build_message(sender, recipient_email, subject, plain_body, html_body, eight_bit=True):
     msg = MIMEMultipart("alternative")
     msg["Subject"] = subject
     msg["From"] = f"Libin @ Viralt.ai <{sender}>"
     msg["To"] = recipient_email
-    msg.attach(MIMEText(plain_body, "plain", "utf-8"))
-    msg.attach(MIMEText(to_html(plain_body), "html", "utf-8"))
+    for body, subtype in ((plain_body, "plain"), (html_body, "html")):
+        part = MIMEText(body, subtype, _UTF8_8BIT if eight_bit else "utf-8")
+        if eight_bit:
+            # Names substituted later may be non-ASCII even when the template is not
+            part.replace_header("Content-Transfer-Encoding", "8bit")
+        msg.attach(part)
     return msg
 
 
-def send_email(smtp, msg):
-    """Sends the email using the modern send_message method."""
-    smtp.send_message(msg)
+def build_message_template(sender, plain_template, html_template):
+    """
+    Build the MIME message once with placeholders and return it as wire-format bytes.
+    render_message then fills in each recipient without touching the email package.
+    Returns None when a line would be too long to send as 8bit; callers then build
+    base64 messages per recipient with build_base64_message instead.
+    """
+    msg = build_message(
+        sender, "__TO__", SUBJECT_TEMPLATE,
+        plain_template, html_template.replace("{name}", "{html_name}"),
+    )
+    template = msg.as_bytes(policy=msg.policy.clone(linesep="\r\n"))
+    for line in template.split(b"\r\n"):
+        limit = MAX_LINE_OCTETS
+        if any(p in line for p in _PLACEHOLDERS):
+            limit -= PLACEHOLDER_HEADROOM
+        if len(line) > limit:
+            return None
+    return template
+
+
+def build_base64_message(sender, recipient_email, ig_handle, name, plain_template, html_template):
+    """Per-recipient message with base64 parts, for servers that do not advertise 8BITMIME."""
+    msg = build_message(
+        sender, recipient_email, SUBJECT_TEMPLATE.replace("__HANDLE__", ig_handle),
+        plain_template.replace("{name}", name),
+        html_template.replace("{name}", html.escape(name)),
+        eight_bit=False,
+    )
+    return msg.as_bytes(policy=msg.policy.clone(linesep="\r\n"))
 
 
-def save_draft(imap, msg):
-    """Append message to the Drafts folder via IMAP."""
+def render_message(template, recipient_email, ig_handle, name):
+    return (template
+            .replace(b"__TO__", recipient_email.encode("utf-8"))
+            .replace(b"__HANDLE__", ig_handle.encode("utf-8"))
+            .replace(b"{html_name}", html.escape(name).encode("utf-8"))
+            .replace(b"{name}", name.encode("utf-8")))
+
+
+def connect_smtp():
+    print(f"Connecting to SMTP {SMTP_HOST}:{SMTP_PORT}...")
+    smtp = smtplib.SMTP(SMTP_HOST, SMTP_PORT)
+    smtp.starttls(context=ssl.create_default_context())
+    smtp.login(SENDER_EMAIL, SENDER_PASSWORD)
+    print("SMTP connected.\n")
+    return smtp
+
+
+def ensure_smtp(smtp):
+    """Return a live SMTP connection, reconnecting if the server dropped this one."""
+    try:
+        if smtp.noop()[0] == 250:
+            return smtp
+    except (smtplib.SMTPException, OSError):
+        pass
+    print("  SMTP connection lost, reconnecting...")
+    smtp.close()
+    return connect_smtp()
+
+
+def send_email(smtp, sender, recipient_email, msg_bytes):
+    """
+    Send the message, backing off exponentially on transient 4xx replies.
+    Returns the SMTP connection to keep using, which may be a fresh one.
+    """
+    delay = 1
+    for attempt in range(SMTP_MAX_RETRIES):
+        try:
+            mail_options = ["BODY=8BITMIME"] if smtp.has_extn("8bitmime") else []
+            smtp.sendmail(sender, [recipient_email], msg_bytes, mail_options)
+            return smtp
+        except smtplib.SMTPServerDisconnected:
+            if attempt == SMTP_MAX_RETRIES - 1:
+                raise
+            print("  Server disconnected, retrying...")
+        except smtplib.SMTPResponseException as e:
+            if e.smtp_code not in SMTP_RETRY_CODES or attempt == SMTP_MAX_RETRIES - 1:
+                raise
+            print(f"  Server replied {e.smtp_code}, retrying in {delay}s...")
+        except smtplib.SMTPRecipientsRefused as e:
+            # RCPT-stage replies (450/452, or 421 mid-transaction) arrive here, not as a response exception
+            code = e.recipients.get(recipient_email, (None, b""))[0]
+            if code not in SMTP_RETRY_CODES or attempt == SMTP_MAX_RETRIES - 1:
+                raise
+            print(f"  Server replied {code} to RCPT, retrying in {delay}s...")
+        time.sleep(delay)
+        delay = min(delay * 2, 30)
+        smtp = ensure_smtp(smtp)
+
+
+def find_drafts_folder(imap):
+    """Return the mailbox that LIST flags as \\Drafts (RFC 6154 SPECIAL-USE), or None."""
+    status, lines = imap.list()
+    if status != "OK":
+        return None
+    for line in lines:
+        match = _LIST_RE.match(line) if isinstance(line, bytes) else None
+        if match and b"\\drafts" in match.group("flags").lower().split():
+            return match.group("name").decode()
+    return None
+
+
+def save_draft(imap, msg_bytes):
+    """Append message to the Drafts folder via IMAP, remembering the folder after the first success."""
+    global _DRAFTS_FOLDER
+    if _DRAFTS_FOLDER is None:
+        _DRAFTS_FOLDER = find_drafts_folder(imap)
+    if _DRAFTS_FOLDER:
+        result = imap.append(_DRAFTS_FOLDER, "\\Draft", None, msg_bytes)
+        if result[0] == "OK":
+            return _DRAFTS_FOLDER
+        raise Exception(f"Could not save to {_DRAFTS_FOLDER}: {result[1]}")
     for folder in ["Drafts", "Draft", "INBOX.Drafts"]:
-        result = imap.append(folder, "\\Draft", None, msg.as_bytes())
+        result = imap.append(folder, "\\Draft", None, msg_bytes)
         if result[0] == "OK":
+            _DRAFTS_FOLDER = folder
             return folder
     raise Exception("Could not find Drafts folder. Tried: Drafts, Draft, INBOX.Drafts")
 
 
+def connect_imap():
+    imap = imaplib.IMAP4_SSL(IMAP_HOST, IMAP_PORT)
+    imap.login(SENDER_EMAIL, SENDER_PASSWORD)
+    return imap
+
+
+def open_imap_pool(size):
+    """Open up to `size` IMAP sessions, settling for fewer (down to one) if the server refuses more."""
+    print(f"Connecting to IMAP {IMAP_HOST}:{IMAP_PORT}...")
+    imaps = [connect_imap()]
+    while len(imaps) < size:
+        try:
+            imaps.append(connect_imap())
+        except (imaplib.IMAP4.error, OSError) as e:
+            print(f"  Server refused another IMAP session ({e}); continuing with {len(imaps)}.")
+            break
+    print(f"IMAP connected ({len(imaps)} session(s)).\n")
+    return imaps
+
+
+def save_drafts(imaps, drafts, results):
+    """
+    Append drafts in parallel, one IMAP session per worker thread. APPEND is a
+    full round trip, so K sessions give roughly K times the throughput.
+    drafts holds (label, ig_handle, msg_bytes) tuples.
+    """
+    lock = threading.Lock()
+    local = threading.local()
+    sessions = iter(imaps)
+
+    def worker(label, handle, msg_bytes):
+        if not hasattr(local, "imap"):
+            with lock:
+                local.imap = next(sessions)
+        try:
+            folder = save_draft(local.imap, msg_bytes)
+        except Exception as e:
+            with lock:
+                print(f"{label}\n  ERROR: {e}\n")
+                results["failed"].append(handle)
+            return
+        with lock:
+            print(f"{label}\n  Saved to {folder}.\n")
+            results["done"].append(handle)
+
+    executor = ThreadPoolExecutor(max_workers=len(imaps))
+    try:
+        futures = [executor.submit(worker, *draft) for draft in drafts]
+        for future in futures:
+            future.result()
+    finally:
+        # On Ctrl+C, drop queued drafts instead of waiting for all of them
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
 def main(dry_run=False, draft_mode=False):
     missing = [k for k, v in {
         "SENDER_EMAIL": SENDER_EMAIL,
@@ -234,79 +398,101 @@ def main(dry_run=False, draft_mode=False):
         sys.exit(1)
 
     email_body_template = load_email_body()
-    influencers = load_influencers()
+    # {name} survives to_html untouched, so the HTML only has to be rendered once per campaign
+    html_template = to_html(email_body_template)
+    msg_template = None if dry_run else build_message_template(SENDER_EMAIL, email_body_template, html_template)
+    influencers, rows, header = load_influencers()
 
     if not influencers:
         print("No influencers found in influencers.csv. Exiting.")
         sys.exit(0)
 
+    sent_col = header.index("sent_date")
+
     print(f"Found {len(influencers)} influencer(s).\n")
 
+    if not dry_run and msg_template is None:
+        print(f"NOTE: {EMAIL_BODY_FILE} has a line too long for 8bit mail; using base64-encoded messages.\n")
+
     if dry_run:
         print("=== DRY RUN MODE - no emails will be sent ===\n")
     elif draft_mode:
         print("=== DRAFT MODE - emails will be saved to Drafts folder ===\n")
 
+    # Split once up front so the send loop below only ever sees pending rows
+    pending = [inf for inf in influencers if not inf.sent_date]
+    already_sent = [inf for inf in influencers if inf.sent_date]
+
     smtp = None
-    imap = None
+    imaps = []
+    rows_changed = False
+    limiter = RateLimiter(tokens_per_minute=60 / max(SEND_INTERVAL_SEC, 1))
+    sent_count = 0
 
     try:
-        if not dry_run:
-            ctx = ssl.create_default_context()
+        if not dry_run and pending:
             if draft_mode:
-                print("Connecting to IMAP imap.secureserver.net:993...")
-                imap = imaplib.IMAP4_SSL("imap.secureserver.net", 993)
-                imap.login(SENDER_EMAIL, SENDER_PASSWORD)
-                print("IMAP connected.\n")
+                imaps = open_imap_pool(min(IMAP_CONNECTIONS, len(pending)))
             else:
-                print(f"Connecting to SMTP {SMTP_HOST}:{SMTP_PORT}...")
-                smtp = smtplib.SMTP(SMTP_HOST, SMTP_PORT)
-                smtp.starttls(context=ctx)
-                smtp.login(SENDER_EMAIL, SENDER_PASSWORD)
-                print("SMTP connected.\n")
+                smtp = connect_smtp()
 
-        results = {"done": [], "failed": []}
+        results = {"done": [inf.ig_handle for inf in already_sent], "failed": []}
+        drafts = []
 
-        for i, inf in enumerate(influencers):
-            handle = inf["ig_handle"]
-            email = inf["email"]
-            name = inf["name"]
+        for inf in already_sent:
+            print(f"@{inf.ig_handle} - already sent on {inf.sent_date}, skipping.")
+        if already_sent:
+            print(f"Skipping {len(already_sent)} already-sent influencer(s); {len(pending)} to go.\n")
 
-            subject = f"Collab Invite: Viralt x @{handle}"
-            body = email_body_template.replace("{name}", name)
-            sent_date = inf["sent_date"]
+        for i, inf in enumerate(pending):
+            handle = inf.ig_handle
+            email = inf.email
+            name = inf.name
 
-            if sent_date:
-                print(f"[{i+1}/{len(influencers)}] @{handle} - already sent on {sent_date}, skipping.\n")
-                results["done"].append(handle)
+            label = f"[{i+1}/{len(pending)}] @{handle} -> {email} (name: {name})"
+
+            if draft_mode and not dry_run:
+                if msg_template:
+                    msg = render_message(msg_template, email, handle, name)
+                else:
+                    msg = build_base64_message(SENDER_EMAIL, email, handle, name, email_body_template, html_template)
+                drafts.append((label, handle, msg))
                 continue
 
-            print(f"[{i+1}/{len(influencers)}] @{handle} -> {email} (name: {name})")
+            print(label)
 
             if dry_run:
+                subject = SUBJECT_TEMPLATE.replace("__HANDLE__", handle)
+                body = email_body_template.replace("{name}", name)
                 print(f"  Subject: {subject}")
                 print(f"  Body preview: {body[:120].strip()}...\n")
                 results["done"].append(handle)
             else:
-                msg = build_message(SENDER_EMAIL, email, subject, body)
+                if msg_template and smtp.has_extn("8bitmime"):
+                    msg = render_message(msg_template, email, handle, name)
+                else:
+                    # 8-bit data needs 8BITMIME and short lines, so otherwise fall back to base64 parts
+                    msg = build_base64_message(SENDER_EMAIL, email, handle, name, email_body_template, html_template)
                 try:
-                    if draft_mode:
-                        folder = save_draft(imap, msg)
-                        print(f"  Saved to {folder}.\n")
-                    else:
-                        send_email(smtp, msg)
-                        today = date.today().strftime("%Y-%m-%d")
-                        mark_sent(handle, today)
-                        print(f"  Sent. Date recorded: {today}\n")
+                    # Throughput is set by SEND_INTERVAL_SEC, not a fixed worst-case sleep
+                    limiter.acquire()
+                    if sent_count and sent_count % SMTP_NOOP_EVERY == 0:
+                        smtp = ensure_smtp(smtp)
+                    smtp = send_email(smtp, SENDER_EMAIL, email, msg)
+                    sent_count += 1
+                    today = date.today().strftime("%Y-%m-%d")
+                    inf.row[sent_col] = today
+                    rows_changed = True
+                    # Rewrite once per send so the date survives a crash mid-campaign
+                    _flush_csv(rows, header)
+                    print(f"  Sent. Date recorded: {today}\n")
                     results["done"].append(handle)
                 except Exception as e:
                     print(f"  ERROR: {e}\n")
                     results["failed"].append(handle)
 
-                # Sleep outside the try block to respect rate limits even on failures
-                if i < len(influencers) - 1:
-                    print("  Waiting 3 minutes before next email...")
-                    time.sleep(180)
+        if drafts:
+            save_drafts(imaps, drafts, results)
 
         action = "Drafted" if draft_mode else "Sent"
         print("=== Campaign Summary ===")
@@ -316,10 +502,12 @@ def main(dry_run=False, draft_mode=False):
         print("Done.")
 
     finally:
-        # Ensures connections are closed even if you keyboard interrupt (Ctrl+C)
+        # Ensures connections are closed and the CSV is saved even if you keyboard interrupt (Ctrl+C)
+        if rows_changed:
+            _flush_csv(rows, header)
         if smtp:
             smtp.quit()
-        if imap:
+        for imap in imaps:
             try:
                 imap.logout()
             except Exception:
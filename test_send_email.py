@@ -0,0 +1,133 @@
+import smtplib
+
+import pytest
+
+import send_email
+
+
+class FakeSMTP(smtplib.SMTP):
+    """SMTP client that runs the real sendmail() logic against scripted replies."""
+
+    def __init__(self, rcpt_replies=(), eight_bit=False):
+        super().__init__()  # no host, so nothing connects
+        self.eight_bit = eight_bit
+        self.rcpt_replies = list(rcpt_replies)
+        self.rcpt_calls = 0
+        self.sent = []
+
+    def ehlo_or_helo_if_needed(self):
+        pass
+
+    def has_extn(self, opt):
+        return self.eight_bit and opt.lower() == "8bitmime"
+
+    def noop(self):
+        return (250, b"OK")
+
+    def mail(self, sender, options=()):
+        return (250, b"OK")
+
+    def rcpt(self, recip, options=()):
+        self.rcpt_calls += 1
+        return self.rcpt_replies.pop(0) if self.rcpt_replies else (250, b"OK")
+
+    def data(self, msg):
+        self.sent.append(msg)
+        return (250, b"OK")
+
+    def rset(self):
+        return (250, b"OK")
+
+    def quit(self):
+        pass
+
+
+@pytest.fixture(autouse=True)
+def no_sleep(monkeypatch):
+    monkeypatch.setattr(send_email.time, "sleep", lambda s: None)
+
+
+def test_send_email_retries_transient_rcpt_reply():
+    smtp = FakeSMTP([(450, b"Mailbox busy")])
+    result = send_email.send_email(smtp, "me@example.com", "jane@example.com", b"Subject: hi\r\n\r\nbody\r\n")
+    assert result is smtp
+    assert smtp.rcpt_calls == 2
+    assert len(smtp.sent) == 1
+
+
+def test_send_email_does_not_retry_permanent_rcpt_reply():
+    smtp = FakeSMTP([(550, b"No such user")])
+    with pytest.raises(smtplib.SMTPRecipientsRefused):
+        send_email.send_email(smtp, "me@example.com", "jane@example.com", b"Subject: hi\r\n\r\nbody\r\n")
+    assert smtp.rcpt_calls == 1
+    assert smtp.sent == []
+
+
+def test_message_template_lines_fit_smtp_limit():
+    body = send_email.load_email_body()
+    template = send_email.build_message_template("me@example.com", body, send_email.to_html(body))
+    assert max(len(line) for line in template.split(b"\r\n")) <= send_email.MAX_LINE_OCTETS
+
+
+def test_message_template_declines_overlong_line():
+    assert send_email.build_message_template("me@example.com", "x" * 1000 + "\n", "<p>hi</p>") is None
+
+
+def test_base64_message_is_seven_bit():
+    body = send_email.load_email_body()
+    msg = send_email.build_base64_message(
+        "me@example.com", "zoe@example.com", "zoe", "Zoë", body, send_email.to_html(body),
+    )
+    assert msg.isascii()
+    assert b"Content-Transfer-Encoding: base64" in msg
+
+
+@pytest.mark.parametrize("content", ["", "ig_handle,email,name,sent_date\n", "handle,mail\nx,y\n"])
+def test_load_influencers_without_usable_rows(tmp_path, monkeypatch, content):
+    csv_file = tmp_path / "influencers.csv"
+    csv_file.write_text(content, encoding="utf-8")
+    monkeypatch.setattr(send_email, "CSV_FILE", str(csv_file))
+    influencers, rows, header = send_email.load_influencers()
+    assert influencers == []
+
+
+@pytest.mark.parametrize("content", ["", "ig_handle,email,name\n", "handle,mail\nx,y\n"])
+def test_main_exits_cleanly_without_usable_rows(tmp_path, monkeypatch, capsys, content):
+    csv_file = tmp_path / "influencers.csv"
+    csv_file.write_text(content, encoding="utf-8")
+    monkeypatch.setattr(send_email, "CSV_FILE", str(csv_file))
+    monkeypatch.setattr(send_email, "SENDER_EMAIL", "me@example.com")
+    monkeypatch.setattr(send_email, "SENDER_PASSWORD", "secret")
+    with pytest.raises(SystemExit) as exc:
+        send_email.main(dry_run=True)
+    assert exc.value.code == 0
+    assert "No influencers found" in capsys.readouterr().out
+
+
+@pytest.fixture
+def long_line_campaign(tmp_path, monkeypatch):
+    """One pending influencer and an email body with a single ~1 KB paragraph line."""
+    body_file = tmp_path / "email_body.txt"
+    body_file.write_text("Hi {name},\n\n" + "word " * 220 + "\n", encoding="utf-8")
+    csv_file = tmp_path / "influencers.csv"
+    csv_file.write_text("ig_handle,email,name,sent_date\njane,jane@example.com,Jane,\n", encoding="utf-8")
+    monkeypatch.setattr(send_email, "EMAIL_BODY_FILE", str(body_file))
+    monkeypatch.setattr(send_email, "CSV_FILE", str(csv_file))
+    monkeypatch.setattr(send_email, "SENDER_EMAIL", "me@example.com")
+    monkeypatch.setattr(send_email, "SENDER_PASSWORD", "secret")
+    return csv_file
+
+
+def test_dry_run_accepts_long_body_lines(long_line_campaign, capsys):
+    send_email.main(dry_run=True)
+    assert "Campaign Summary" in capsys.readouterr().out
+
+
+def test_long_body_lines_are_sent_as_base64(long_line_campaign, monkeypatch):
+    smtp = FakeSMTP(eight_bit=True)
+    monkeypatch.setattr(send_email, "connect_smtp", lambda: smtp)
+    send_email.main()
+    assert len(smtp.sent) == 1
+    assert b"Content-Transfer-Encoding: base64" in smtp.sent[0]
+    assert max(len(line) for line in smtp.sent[0].split(b"\r\n")) <= send_email.MAX_LINE_OCTETS
+    assert "jane,jane@example.com,Jane," in long_line_campaign.read_text(encoding="utf-8")